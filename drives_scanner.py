@@ -6,9 +6,16 @@ import pandas as pd
 from pathlib import Path
 import logging
 import os
+import sys
+import ctypes
+import struct
+import functools
+from dataclasses import dataclass
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 if os.name == "nt":
-    import win32api
-    import ctypes
+    from ctypes import wintypes
 
 """
 Drive scanning and analysis module.
@@ -24,21 +31,189 @@ The main functionality is exposed through two key functions:
 - scan_valid_drives_to_dict(): Returns drive information as a nested dictionary
 """
 
+# Drives are separate devices and are scanned in parallel, one thread each.
+# Within a drive only a few directories are sized at once: that keeps the queue of SSDs/USB bridges busy,
+# while more concurrent walkers would make a spinning disk seek back and forth between them.
+MAX_DRIVE_WORKERS = 32
+MAX_DIRECTORY_WORKERS_PER_DRIVE = 4
+DATE_PATTERN = re.compile(r"\d{4}\W\d{2}\W\d{2}")
+
+# getattrlistbulk(2) constants from <sys/attr.h> and <sys/vnode.h> (macOS)
+_ATTR_BIT_MAP_COUNT = 5
+_ATTR_CMN_NAME = 0x00000001
+_ATTR_CMN_OBJTYPE = 0x00000008
+_ATTR_CMN_RETURNED_ATTRS = 0x80000000
+_ATTR_FILE_DATALENGTH = 0x00000200
+_FSOPT_PACK_INVAL_ATTRS = 0x00000008
+_VREG = 1
+_VDIR = 2
+_BULK_BUFFER_SIZE = 64 * 1024
+# entry length, returned attribute_set_t, name attrreference_t, fsobj_type_t; followed by the data length (off_t)
+_BULK_ENTRY_HEADER = struct.Struct("=I5IiII")
+_BULK_ENTRY_DATALENGTH = struct.Struct("=q")
+_BULK_ENTRY_NAME_REF_OFFSET = 24
+
+
+class _AttrList(ctypes.Structure):
+    _fields_ = [
+        ("bitmapcount", ctypes.c_ushort),
+        ("reserved", ctypes.c_uint16),
+        ("commonattr", ctypes.c_uint32),
+        ("volattr", ctypes.c_uint32),
+        ("dirattr", ctypes.c_uint32),
+        ("fileattr", ctypes.c_uint32),
+        ("forkattr", ctypes.c_uint32),
+    ]
+
+
+_getattrlistbulk = None
+if sys.platform == "darwin":
+    _getattrlistbulk = getattr(ctypes.CDLL(None, use_errno=True), "getattrlistbulk", None)
+    if _getattrlistbulk is not None:
+        _getattrlistbulk.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint64]
+        _getattrlistbulk.restype = ctypes.c_int
+
+# kernel32 functions are bound once with prototypes, so ctypes does not look them up and infer argument types per call
+_MAX_PATH = 260
+if os.name == "nt":
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _GetDriveTypeW = _kernel32.GetDriveTypeW
+    _GetDriveTypeW.argtypes = [wintypes.LPCWSTR]
+    _GetDriveTypeW.restype = wintypes.UINT
+    _GetVolumeInformationW = _kernel32.GetVolumeInformationW
+    _GetVolumeInformationW.argtypes = [
+        wintypes.LPCWSTR, wintypes.LPWSTR, wintypes.DWORD,
+        wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD,
+        wintypes.LPWSTR, wintypes.DWORD,
+    ]
+    _GetVolumeInformationW.restype = wintypes.BOOL
+
+
+def _is_pruned_directory(name: str, prune) -> bool:
+    """Checks if a subdirectory is left out when computing directory sizes (hidden or blacklisted)."""
+    return name.startswith(".") or name in prune
+
 
-def get_dir_size(dir_path):
+def _scandir_size(dir_path, prune=frozenset()) -> int:
+    """
+    Sums up the file sizes of a directory tree by walking it iteratively with os.scandir.
+    The entry types come from the directory listing itself, so only regular files get an extra stat call.
+    Symlinks are neither followed nor counted, entries removed while walking are skipped.
+
+    Args:
+        dir_path (Path | str): Path object or string path of directory
+        prune (set[str]): names of subdirectories that are not descended into, additionally to hidden ones
+
+    Returns:
+        int: Total size in bytes
+    """
+    total = 0
+    stack = [os.fspath(dir_path)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _is_pruned_directory(entry.name, prune):
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        total += entry.stat(follow_symlinks=False).st_size
+                    except FileNotFoundError:
+                        continue
+    return total
+
+
+def _parse_bulk_entries(buffer, count: int):
+    """
+    Parses the entries packed into a getattrlistbulk(2) result buffer.
+
+    Args:
+        buffer: buffer filled by getattrlistbulk (requested with FSOPT_PACK_INVAL_ATTRS)
+        count (int): number of entries returned by getattrlistbulk
+
+    Yields:
+        tuple[str, int, int]: name, object type (VREG, VDIR, ...) and data length of every entry
+    """
+    offset = 0
+    for _ in range(count):
+        (length, _common_attrs, _vol_attrs, _dir_attrs, file_attrs, _fork_attrs,
+         name_offset, name_length, obj_type) = _BULK_ENTRY_HEADER.unpack_from(buffer, offset)
+        name_start = offset + _BULK_ENTRY_NAME_REF_OFFSET + name_offset
+        name = os.fsdecode(bytes(buffer[name_start:name_start + name_length - 1]))
+        size = 0
+        if file_attrs & _ATTR_FILE_DATALENGTH:
+            size = _BULK_ENTRY_DATALENGTH.unpack_from(buffer, offset + _BULK_ENTRY_HEADER.size)[0]
+        yield name, obj_type, size
+        offset += length
+
+
+def _bulk_walk_size_darwin(dir_path, prune=frozenset()) -> int:
+    """
+    Sums up the file sizes of a directory tree on macOS with getattrlistbulk(2),
+    which returns names, types and sizes of many entries per syscall instead of one stat call per file.
+    Symlinks are neither followed nor counted, directories removed while walking are skipped.
+
+    Args:
+        dir_path (Path | str): Path object or string path of directory
+        prune (set[str]): names of subdirectories that are not descended into, additionally to hidden ones
+
+    Returns:
+        int: Total size in bytes
+    """
+    attributes = _AttrList(
+        bitmapcount=_ATTR_BIT_MAP_COUNT,
+        commonattr=_ATTR_CMN_RETURNED_ATTRS | _ATTR_CMN_NAME | _ATTR_CMN_OBJTYPE,
+        fileattr=_ATTR_FILE_DATALENGTH,
+    )
+    buffer = ctypes.create_string_buffer(_BULK_BUFFER_SIZE)
+    total = 0
+    stack = [os.fspath(dir_path)]
+    while stack:
+        path = stack.pop()
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            continue
+        try:
+            while True:
+                count = _getattrlistbulk(fd, ctypes.byref(attributes), buffer, len(buffer), _FSOPT_PACK_INVAL_ATTRS)
+                if count == 0:
+                    break
+                if count < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, os.strerror(errno), path)
+                for name, obj_type, size in _parse_bulk_entries(buffer, count):
+                    if obj_type == _VDIR:
+                        if not _is_pruned_directory(name, prune):
+                            stack.append(os.path.join(path, name))
+                    elif obj_type == _VREG:
+                        total += size
+        finally:
+            os.close(fd)
+    return total
+
+
+def get_dir_size(dir_path, prune=frozenset()):
     """
     Computes total file size of a directory tree.
+    Hidden subdirectories and subdirectories named in prune are skipped.
     Returns -1 if scanning is disabled or a PermissionError occurs.
 
     Args:
         dir_path (Path | str): Path object or string path of directory
+        prune (set[str]): names of subdirectories to skip, e.g. the blacklisted directories
 
     Returns:
         int: Total size in bytes, or -1 if scanning is disabled or could not be completed.
     """
     try:
-        p = Path(dir_path)
-        return sum(f.stat().st_size for f in p.rglob('*') if f.is_file())
+        if _getattrlistbulk is not None:
+            return _bulk_walk_size_darwin(dir_path, prune)
+        return _scandir_size(dir_path, prune)
     except PermissionError as e:
         warnings.warn(f"permission denied accessing {e.filename}, "
                       f"while calculating file sizes.\nFolder size could not be calculated.")
@@ -56,7 +231,7 @@ def get_date_from_dir_name(dir_name: str) -> str | None:
     Returns:
         str: date in YYYY-MM-DD format or None
     """
-    if re.fullmatch(r"\d{4}\W\d{2}\W\d{2}", dir_name[:10]):
+    if DATE_PATTERN.fullmatch(dir_name[:10]):
         return dir_name[:10]
     else:
         return None
@@ -67,6 +242,18 @@ def bytes_to_gb(bytes_size: int) -> float:
     return round(bytes_size / (1024 ** 3), 3)
 
 
+@functools.lru_cache(maxsize=64)
+def _volume_label(mountpoint: str) -> str:
+    """
+    Returns the volume label of a drive on Windows.
+    Results are cached per mountpoint; the cache is cleared on every drive enumeration by enumerate_drives().
+    """
+    label = ctypes.create_unicode_buffer(_MAX_PATH + 1)
+    if not _GetVolumeInformationW(mountpoint, label, len(label), None, None, None, None, 0):
+        raise ctypes.WinError(ctypes.get_last_error())
+    return label.value
+
+
 def is_external_drive(p: psutil._common.sdiskpart) -> bool:
     """
     Checks multiple (flawed) heuristics, if the drive is physical, external and no CD drive.
@@ -86,9 +273,9 @@ def is_external_drive(p: psutil._common.sdiskpart) -> bool:
         return False
 
     if os.name == "nt":
-        if win32api.GetVolumeInformation(p.mountpoint)[0] == "":
+        if _volume_label(p.mountpoint) == "":
             return False
-        drive_type_code = ctypes.windll.kernel32.GetDriveTypeW(p.mountpoint)
+        drive_type_code = _GetDriveTypeW(p.mountpoint)
         drive_removable = 2
         drive_fixed = 3
         # despite 3 means fixed, some removable USB-drives have DriveType 3 :(
@@ -98,6 +285,44 @@ def is_external_drive(p: psutil._common.sdiskpart) -> bool:
         return p.mountpoint.startswith(("/media", "/mnt", "/Volumes"))
 
 
+@dataclass
+class DriveInfo:
+    """
+    Properties of a drive, collected once when the drives are enumerated.
+    The storage usage is not part of it, so blacklisted drives are never queried for it.
+
+    Attributes:
+        mountpoint (str): The mountpoint of the drive.
+        name (str): The volume label on Windows, otherwise the name of the mountpoint.
+    """
+    mountpoint: str
+    name: str
+
+
+def get_drive_name(mountpoint: str) -> str:
+    """Returns the volume label on Windows, otherwise the name of the mountpoint."""
+    if os.name == "nt":
+        return _volume_label(mountpoint)
+    else:
+        return Path(mountpoint).name
+
+
+def enumerate_drives() -> Iterator[DriveInfo]:
+    """
+    Yields the properties of all drives considered external drives by is_external_drive().
+    Every drive is queried once per enumeration.
+
+    Yields:
+        DriveInfo: properties of an external drive
+    """
+    # drives may have been swapped since the last scan
+    _volume_label.cache_clear()
+    for p in psutil.disk_partitions(all=False):
+        if not is_external_drive(p):
+            continue
+        yield DriveInfo(mountpoint=p.mountpoint, name=get_drive_name(p.mountpoint))
+
+
 def get_external_drives() -> list[str]:
     """
     Returns a list of mountpoints paths of all drives considered external drives by is_external_drive().
@@ -105,19 +330,15 @@ def get_external_drives() -> list[str]:
     Returns:
         list[str]: A list of mountpoints of drives (e.g. ['C:\\', 'D:\\', 'F:\\']).
     """
-    return [
-        p.mountpoint
-        for p in psutil.disk_partitions(all=False)
-        if is_external_drive(p)
-    ]
+    return [drive.mountpoint for drive in enumerate_drives()]
 
 
-def get_drive_properties(mountpoint) -> dict:
+def get_drive_properties(drive: DriveInfo) -> dict:
     """
     Returns a dictionary containing properties of a drive.
 
     Args:
-        mountpoint (str): The mountpoint of the drive.
+        drive (DriveInfo): The drive, as enumerated by enumerate_drives().
 
     Returns:
         dict: A dictionary with drive properties.
@@ -127,32 +348,29 @@ def get_drive_properties(mountpoint) -> dict:
         - "total-storage": The total storage size of the drive in GB.
         - "free-storage": The free storage size of the drive in GB.
     """
-    storage_usage = shutil.disk_usage(mountpoint)
-    if os.name == "nt":
-        drive_name = win32api.GetVolumeInformation(mountpoint)[0]
-    else:
-        drive_name = Path(mountpoint).name
-    logging.info(f"scanning {drive_name}...")
+    storage_usage = shutil.disk_usage(drive.mountpoint)
+    logging.info(f"scanning {drive.name}...")
     return {
-        "drive-name": drive_name,
+        "drive-name": drive.name,
         "total-storage": bytes_to_gb(storage_usage.total),
         "free-storage": bytes_to_gb(storage_usage.free),
     }
 
 
-def is_valid_directory(subdir: Path, blacklist_directories: set[str]) -> bool:
+def is_valid_directory(subdir: os.DirEntry, blacklist_directories: set[str]) -> bool:
     """
-    Checks if a given Path is a valid directory, i.e. if it should be listed it in the drives' documentation.
+    Checks if a given directory entry is a valid directory, i.e. if it should be listed it in the drives' documentation.
+    The check uses the file type cached by os.scandir, so it does not need an extra stat call.
 
     Parameters:
-        subdir (Path): The path to check.
+        subdir (os.DirEntry): The directory entry to check.
         blacklist_directories (set[str]): A set of directory names to blacklist.
 
     Returns:
-        bool: True if the Path is a valid directory, False otherwise.
+        bool: True if the entry is a valid directory, False otherwise.
     """
     return (
-            subdir.is_dir()
+            subdir.is_dir(follow_symlinks=False)
             and not subdir.name.startswith(".")
             and subdir.name not in blacklist_directories
     )
@@ -169,34 +387,69 @@ def scan_directories(parent_dir, blacklist_directories=()):
     Returns:
         list[dict]: A list of directories with their properties.
     """
+    with os.scandir(parent_dir) as entries:
+        subdirs = [subdir for subdir in entries if is_valid_directory(subdir, blacklist_directories)]
+    if not subdirs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_DIRECTORY_WORKERS_PER_DRIVE, len(subdirs))) as executor:
+        sizes = list(executor.map(
+            get_dir_size,
+            [subdir.path for subdir in subdirs],
+            repeat(blacklist_directories),
+        ))
     dirs = [
         {
             "project-name": subdir.name,
-            "size": bytes_to_gb(get_dir_size(subdir)),
+            "size": bytes_to_gb(size),
             "date": get_date_from_dir_name(subdir.name)
         }
-        for subdir in Path(parent_dir).iterdir()
-        if is_valid_directory(subdir, blacklist_directories)
+        for subdir, size in zip(subdirs, sizes)
     ]
     return dirs
 
 
-def is_blacklisted_drive(mountpoint: str, blacklist_drives: set[str]):
+def is_blacklisted_drive(drive: DriveInfo, blacklist_drives: set[str]):
     """
     Checks if a given drive is blacklisted.
 
     Parameters:
-        mountpoint (str): The mountpoint of the drive to check.
+        drive (DriveInfo): The drive to check.
         blacklist_drives (set[str]): A set of drive names to blacklist.
 
     Returns:
         bool: True if the drive is blacklisted, False otherwise.
     """
     if os.name == "nt":
-        drive_name = win32api.GetVolumeInformation(mountpoint)[0]
-        return drive_name in blacklist_drives
+        return drive.name in blacklist_drives
     else:
-        return mountpoint in blacklist_drives
+        return drive.mountpoint in blacklist_drives
+
+
+def _scan_drive(drive: DriveInfo, blacklist_directories) -> tuple[dict, list[dict]]:
+    """Returns the properties of a drive and the properties of its valid directories."""
+    return get_drive_properties(drive), scan_directories(drive.mountpoint, blacklist_directories)
+
+
+def _scan_valid_drives(blacklist_drives=(), blacklist_directories=()) -> list[tuple[dict, list[dict]]]:
+    """
+    Scans all valid drives concurrently, so separate physical drives are read at the same time.
+
+    Args:
+        blacklist_drives (set[str]): A set of drive names to blacklist.
+        blacklist_directories (set[str]): A set of directory names to blacklist.
+
+    Returns:
+        list[tuple[dict, list[dict]]]: Drive properties and directories properties of every valid drive.
+    """
+    drives = [
+        drive
+        for drive in enumerate_drives()
+        if not is_blacklisted_drive(drive, blacklist_drives)
+    ]
+    if not drives:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_DRIVE_WORKERS, len(drives))) as executor:
+        return list(executor.map(_scan_drive, drives, repeat(blacklist_directories)))
 
 
 def scan_valid_drives_to_df(blacklist_drives=(), blacklist_directories=()) -> pd.DataFrame:
@@ -211,15 +464,24 @@ def scan_valid_drives_to_df(blacklist_drives=(), blacklist_directories=()) -> pd
     Returns:
         pd.DataFrame: A DataFrame with the properties of the valid drives.
     """
-    mountpoints = get_external_drives()
-    directories = []
-    for mountpoint in mountpoints:
-        if is_blacklisted_drive(mountpoint, blacklist_drives):
-            continue
-        drive_properties = get_drive_properties(mountpoint)
-        directories_properties = scan_directories(mountpoint, blacklist_directories)
-        directories.extend([directory | drive_properties for directory in directories_properties])
-    return pd.DataFrame(directories)
+    project_names, sizes, dates = [], [], []
+    drive_names, total_storages, free_storages = [], [], []
+    for drive_properties, directories_properties in _scan_valid_drives(blacklist_drives, blacklist_directories):
+        project_names.extend(directory["project-name"] for directory in directories_properties)
+        sizes.extend(directory["size"] for directory in directories_properties)
+        dates.extend(directory["date"] for directory in directories_properties)
+        directories_count = len(directories_properties)
+        drive_names.extend([drive_properties["drive-name"]] * directories_count)
+        total_storages.extend([drive_properties["total-storage"]] * directories_count)
+        free_storages.extend([drive_properties["free-storage"]] * directories_count)
+    return pd.DataFrame({
+        "project-name": project_names,
+        "size": sizes,
+        "date": dates,
+        "drive-name": drive_names,
+        "total-storage": total_storages,
+        "free-storage": free_storages,
+    })
 
 
 def scan_valid_drives_to_dict(blacklist_drives=(), blacklist_directories=()) -> dict:
@@ -228,7 +490,7 @@ def scan_valid_drives_to_dict(blacklist_drives=(), blacklist_directories=()) ->
     containing their storage properties and scanned project directories.
 
     A drive is considered valid if:
-      • it is detected as external by `get_external_drives()`
+      • it is detected as external by `enumerate_drives()`
       • it is not in `blacklist_drives`
 
     Args:
@@ -249,13 +511,9 @@ def scan_valid_drives_to_dict(blacklist_drives=(), blacklist_directories=()) ->
                 }
             }
     """
-    mountpoints = get_external_drives()
     drives = {}
-    for mountpoint in mountpoints:
-        if is_blacklisted_drive(mountpoint, blacklist_drives):
-            continue
-        drive_properties = get_drive_properties(mountpoint)
-        drive_properties["projects"] = scan_directories(mountpoint, blacklist_directories)
+    for drive_properties, directories_properties in _scan_valid_drives(blacklist_drives, blacklist_directories):
+        drive_properties["projects"] = directories_properties
         drives[drive_properties["drive-name"]] = drive_properties
     return drives
 
@@ -1,6 +1,7 @@
 import gspread
 import gspread_formatting
 import pandas as pd
+from gspread.utils import ValueRenderOption
 from colorsys import hsv_to_rgb
 from gspread_formatting import ConditionalFormatRule, GridRange, BooleanRule, BooleanCondition, CellFormat, \
     textFormat, Color, get_conditional_format_rules
@@ -36,6 +37,8 @@ class SpreadsheetDocu:
         worksheet (gspread.Worksheet): First worksheet (drives documentation).
         drives_col (str): Column name for drive names.
         dir_col (str): Column name for project names.
+        _cached_values (tuple[list, list[list]] | None): Header and rows of the last uploaded drives documentation,
+            saves downloading it again.
     """
     def __init__(self, spreadsheet_name: str):
         """
@@ -51,10 +54,38 @@ class SpreadsheetDocu:
 
         self.drives_col = "drive-name"
         self.dir_col = "project-name"
+        self._cached_values: tuple[list, list[list]] | None = None
 
-    def fetch_online_docu(self) -> pd.DataFrame:
-        """fetch online drives documentation and return as DataFrame"""
-        return pd.DataFrame(self.worksheet.get_all_records())
+    def fetch_online_docu(self, as_values: bool = False) -> pd.DataFrame | tuple[list, list[list]]:
+        """
+        fetch online drives documentation (from cache, if it was uploaded by this object).
+
+        Args:
+            as_values (bool): return header and rows of cell values instead of a DataFrame
+
+        Returns:
+            pd.DataFrame | tuple[list, list[list]]: drives documentation
+        """
+        if self._cached_values is not None:
+            # copies, so callers can't change the cache
+            cached_header, cached_rows = self._cached_values
+            header, rows = list(cached_header), [list(row) for row in cached_rows]
+        else:
+            header, rows = self._fetch_online_values()
+        if as_values:
+            return header, rows
+        return pd.DataFrame(rows, columns=header)
+
+    def invalidate_cache(self):
+        """forget the cached drives documentation, so the next fetch downloads it again"""
+        self._cached_values = None
+
+    def _fetch_online_values(self) -> tuple[list, list[list]]:
+        """fetch online drives documentation as header and rows of unformatted cell values"""
+        values = self.worksheet.get_values(value_render_option=ValueRenderOption.unformatted)
+        if not values:
+            return [], []
+        return values[0], values[1:]
 
     def load_blacklist(self) -> tuple[set[str], set[str]]:
         """
@@ -65,11 +96,13 @@ class SpreadsheetDocu:
             tuple[set[str], set[str]]: tuple of sets of blacklisted drives and directories
         """
         worksheet_blacklist = self.sh.get_worksheet(1)
-        df = pd.DataFrame(worksheet_blacklist.get_all_records())
-        df = df.replace("", pd.NA)  # different length of columns are filled with ""
-        bl_drives = df["blacklist drives"].dropna().to_list()
-        bl_directories = df["blacklist folders"].dropna().to_list()
-        return set(bl_drives), set(bl_directories)
+        header, *rows = worksheet_blacklist.get_values()
+        drives_position = header.index("blacklist drives")
+        directories_position = header.index("blacklist folders")
+        # different length of columns are padded with ""
+        bl_drives = {row[drives_position] for row in rows if row[drives_position] != ""}
+        bl_directories = {row[directories_position] for row in rows if row[directories_position] != ""}
+        return bl_drives, bl_directories
 
     def apply_blacklist_on_df(self, docu: pd.DataFrame, bl_drives: set, bl_directories: set) -> pd.DataFrame:
         """
@@ -95,27 +128,12 @@ class SpreadsheetDocu:
         if not df.equals(df_filtered):
             self.update_online_spreadsheet(df_filtered)
 
-    def _update_docu_offline(self, downloaded_docu: pd.DataFrame, connected_drives_docu: pd.DataFrame) -> pd.DataFrame:
-        """
-        updates the downloaded_docu with the connected_devices_docu
-
-        Args:
-            downloaded_docu:
-            connected_drives_docu:
-
-        Returns:
-
-        """
-        if self.drives_col in connected_drives_docu.keys():
-            connected_drives = connected_drives_docu[self.drives_col].unique()
-            downloaded_docu = downloaded_docu[
-                ~downloaded_docu[self.drives_col].isin(connected_drives)
-            ]
-        return pd.concat([downloaded_docu, connected_drives_docu], ignore_index=True)
-
-    def _upload_docu(self, docu):
+    def _upload_docu(self, header: list, rows: list[list]):
+        self.invalidate_cache()
         self.worksheet.clear()
-        self.worksheet.update([docu.columns.values.tolist()] + docu.values.tolist())
+        self.worksheet.update([header] + rows)
+        # empty cells are downloaded as "", so the cache matches a fresh download
+        self._cached_values = list(header), [["" if value is None else value for value in row] for row in rows]
 
     def update_online_spreadsheet(self, connected_drives_docu):
         """
@@ -127,11 +145,30 @@ class SpreadsheetDocu:
         Returns:
             None
         """
-        downloaded_docu = self.fetch_online_docu()
-        updated_docu = self._update_docu_offline(downloaded_docu, connected_drives_docu)
+        downloaded_header, downloaded_rows = self._fetch_online_values()
         blacklist_drives, blacklist_directories = self.load_blacklist()
-        updated_docu = self.apply_blacklist_on_df(updated_docu, blacklist_drives, blacklist_directories)
-        self._upload_docu(updated_docu)
+        connected_columns = connected_drives_docu.columns.tolist()
+        # keep all columns of the online documentation (e.g. added by users), missing cells are left empty
+        header = downloaded_header + [column for column in connected_columns if column not in downloaded_header]
+        drives_position = header.index(self.drives_col)
+        dir_position = header.index(self.dir_col)
+        # rows of connected drives are replaced by their new documentation
+        excluded_drives = blacklist_drives | set(connected_drives_docu[self.drives_col])
+
+        padded_rows = (row + [""] * (len(header) - len(row)) for row in downloaded_rows)
+        updated_rows = [
+            row
+            for row in padded_rows
+            if row[drives_position] not in excluded_drives and row[dir_position] not in blacklist_directories
+        ]
+        connected_positions = [header.index(column) for column in connected_columns]
+        for values in connected_drives_docu.values.tolist():
+            row = [""] * len(header)
+            for position, value in zip(connected_positions, values):
+                row[position] = value
+            if row[drives_position] not in blacklist_drives and row[dir_position] not in blacklist_directories:
+                updated_rows.append(row)
+        self._upload_docu(header, updated_rows)
 
 
 class SpreadsheetFormatter:
@@ -163,10 +200,12 @@ class SpreadsheetFormatter:
         Returns:
             str: spreadsheet column id
         """
-        if position > 25:
-            return (self.get_column_id_from_column_position(position // 26 -1)
-                    + self.get_column_id_from_column_position(position % 26))
-        return chr(ord('A') + position)
+        column_id = ""
+        position += 1
+        while position:
+            position, remainder = divmod(position - 1, 26)
+            column_id = chr(ord('A') + remainder) + column_id
+        return column_id
 
     @staticmethod
     def create_conditional_formatting_rule_text_eq(worksheet, text_match, color, cell_range) -> ConditionalFormatRule:
@@ -196,10 +235,15 @@ class SpreadsheetFormatter:
         Returns:
              ConditionalFormatRules: List of conditional formatting rules with rules applying to the given column position removed.
         """
-        for rule in rules[:]:
-            if rule.ranges[0].startColumnIndex == column_position \
-                    and rule.ranges[0].endColumnIndex == column_position + 1:
-                rules.remove(rule)
+        kept_rules = [
+            rule
+            for rule in rules
+            if not (rule.ranges[0].startColumnIndex == column_position
+                    and rule.ranges[0].endColumnIndex == column_position + 1)
+        ]
+        # ConditionalFormatRules does not support slice assignment
+        rules.clear()
+        rules.extend(kept_rules)
         return rules
 
     def color_unique_cells_by_column(self, column_name):
@@ -211,12 +255,12 @@ class SpreadsheetFormatter:
             column_name (str): Name of the column to color unique cells in.
         """
         rules = get_conditional_format_rules(self.spread.worksheet)
-        df = self.spread.fetch_online_docu()
-        column_values = df[column_name].unique()
+        header, rows = self.spread.fetch_online_docu(as_values=True)
+        column_position = header.index(column_name)
+        column_values = list(dict.fromkeys(row[column_position] for row in rows))
         colors = generate_distinct_colors(len(column_values))
-        column_position = df.columns.get_loc(column_name)
         column_id_gspread = self.get_column_id_from_column_position(column_position)
-        range_of_column_gspread = f"{column_id_gspread}2:{column_id_gspread}{max(990, len(df))}"
+        range_of_column_gspread = f"{column_id_gspread}2:{column_id_gspread}{max(990, len(rows))}"
 
         rules = self.remove_rules_by_column(rules, column_position)
         for value, color in zip(column_values, colors):
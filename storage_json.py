@@ -1,17 +1,28 @@
 import json
 import os
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def load_json(file_path):
     if not os.path.exists(file_path):
         print("path does not exist: new file will be created")
         return {}
+    elif orjson is not None:
+        with open(file_path, "rb") as f:
+            return orjson.loads(f.read())
     else:
-        with open(file_path, "r") as f:
+        with open(file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
             return data
 
 
 def save_json(file_path, data):
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)